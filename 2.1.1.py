@@ -67,11 +67,14 @@ class DataSet:
 
     def csv_filter(self):
         self.filterVacancies = []
+        firstLine = self.firstLine
+        prof = self.inputValues.professionName
+        append = self.filterVacancies.append
         for line in self.otherLines:
-            newDict = dict(zip(self.firstLine, line))
-            newDict["is_needed"] = newDict["name"].find(self.inputValues.professionName) > -1
+            newDict = dict(zip(firstLine, line))
+            newDict["is_needed"] = newDict["name"].find(prof) > -1
             vacancy = Vacancy(newDict)
-            self.filterVacancies.append(vacancy)
+            append(vacancy)
         self.necessaryVacancies = list(filter(lambda v: v.is_needed, self.filterVacancies))
 
     def getYears(self):
@@ -1,15 +1,17 @@
 import sqlite3
-import pandas as pd
+import pyarrow.csv as pacsv
 
 def create_table():
     try:
         sqlite_connection = sqlite3.connect('Database_3_5_1.db')
-        cursor = sqlite_connection.cursor()
+        sqlite_connection.execute('PRAGMA synchronous=OFF')
+        sqlite_connection.execute('PRAGMA journal_mode=MEMORY')
 
-        df = pd.read_csv("currencies.csv")
-        df.to_sql('task_3_5_1', sqlite_connection, if_exists='replace', index=False)
-
-        cursor.close()
+        df = pacsv.read_csv("currencies.csv").to_pandas()
+        df = df.rename(columns={'': 'Unnamed: 0'})
+        df.to_sql('task_3_5_1', sqlite_connection, if_exists='replace', index=False,
+                  method='multi', chunksize=1000)
+        sqlite_connection.commit()
 
     except sqlite3.Error as error:
         print("Ошибка при подключении к sqlite", error)
@@ -21,4 +23,4 @@ def create_table():
 
 
 if __name__ == '__main__':
-    create_table()
\ No newline at end of file
+    create_table()
@@ -1,6 +1,8 @@
 from unittest import TestCase, main
 from code_Fail import Salary
 from code_Fail import DataSet
+import importlib
+import sqlite3
 import unittest
 
 
@@ -13,19 +15,32 @@ class Test2(TestCase):
     def test_SalaryCurrencyTest(self):
         self.assertEqual(Salary(dic={"salary_from" : 100, "salary_to" : 200, "salary_currency" : "EUR"}).salaryRub, 8985.0)
     def test_TryToAddTest(self):
-        self.assertEqual(DataSet().tryToAdd(dic={'1' : 1}, key='1', val=1), {'1': 2})
-        self.assertEqual(DataSet().tryToAdd(dic={'1' : 1}, key='2', val=2), {'1': 1, '2': 2})
+        self.assertEqual(DataSet.tryToAdd(dic={'1' : 1}, key='1', val=1), {'1': 2})
+        self.assertEqual(DataSet.tryToAdd(dic={'1' : 1}, key='2', val=2), {'1': 1, '2': 2})
     def test_DatasetAveregeSalaryTest(self):
-        self.assertEqual(DataSet().getAverageSalary(count={'2007': 2}, sum={'2007': 10}), {'2007': 5})
+        self.assertEqual(DataSet.getAverageSalary(count={'2007': 2}, sum={'2007': 10}), {'2007': 5})
     def test_SortedDictTest(self):
-        self.assertEqual(len(DataSet().getSortedDict(
+        self.assertEqual(len(DataSet.getSortedDict(
             keySalary={'1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10, '11': 11,
                        '12': 12})), 10)
     def test_UpdateKeysTest(self):
-        self.assertEqual(DataSet().updateKeys(keyCount={'2022': 1000}),
+        ds = DataSet.__new__(DataSet)
+        ds.allYears = [2007, 2008, 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022]
+        self.assertEqual(ds.updateKeys(keyCount={'2022': 1000}),
             {'2022': 1000, 2007: 0, 2008: 0, 2009: 0, 2010: 0, 2011: 0, 2012: 0, 2013: 0, 2014: 0, 2015: 0, 2016: 0, 2017: 0, 2018: 0, 2019: 0, 2020: 0, 2021: 0, 2022: 0})
-        self.assertEqual(DataSet().updateKeys(keyCount={'2023' : 1000}),
+        self.assertEqual(ds.updateKeys(keyCount={'2023' : 1000}),
             {'2023': 1000, 2007: 0, 2008: 0, 2009: 0, 2010: 0, 2011: 0, 2012: 0, 2013: 0, 2014: 0, 2015: 0, 2016: 0, 2017: 0, 2018: 0, 2019: 0, 2020: 0, 2021: 0, 2022: 0})
 
+class Test3_5_1(TestCase):
+
+    def test_CreateTableTest(self):
+        importlib.import_module('3_5_1').create_table()
+        sqlite_connection = sqlite3.connect('Database_3_5_1.db')
+        count = sqlite_connection.execute('SELECT COUNT(*) FROM task_3_5_1').fetchone()[0]
+        columns = [row[1] for row in sqlite_connection.execute('PRAGMA table_info(task_3_5_1)')]
+        sqlite_connection.close()
+        self.assertEqual(count, 234)
+        self.assertIn('Unnamed: 0', columns)
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,15 +1,24 @@
 import csv
+import functools
+import heapq
 import math
+import os
 import re
 import sys
 from collections import Counter
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import openpyxl
 from openpyxl import Workbook
 from openpyxl.styles import Font, Side, Border
 from openpyxl.utils import get_column_letter
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
 import doctest
@@ -30,30 +39,52 @@ currency_to_rub = {
     "UZS": 0.0055,
 }
 
+'''
+    Стили для отчета в экселе, создаются один раз на модуль
+'''
+BOLD = Font(bold=True)
+SIDE = Side(border_style='thin', color="00000000")
+CELL_BORDER = Border(left=SIDE, right=SIDE, top=SIDE, bottom=SIDE)
+
+'''
+    Шаблон pdf отчета, создается один раз на модуль
+'''
+_ENV = Environment(loader=FileSystemLoader('.'))
+_TEMPLATE = _ENV.get_template('pdf_template.html')
+
+
+@functools.lru_cache(maxsize=1)
+def _pdf_cfg():
+    '''
+        Конфигурация wkhtmltopdf, создается один раз при первом pdf отчете
+        :return: Configuration
+    '''
+    return pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
+
 class Vacancy:
     '''
         Класс для представления вакансий
 
         Attributes:
-            dic (dict) словарь вакансий из csv файла
-            salary (int) зп из csv файла
-            is_needed (string) нужные вакансии из csv файла
+            year (int) год публикации вакансии
+            area_name (string) город вакансии
+            is_needed (bool) нужная ли вакансия
+            salaryRub (float) средняя зп в рублях
         :return: void
     '''
+    __slots__ = ('year', 'area_name', 'is_needed', 'salaryRub')
+
     def __init__(self, dic: dict):
-        self.dic = dic
-        self.salary = Salary(dic)
-        self.dic["year"] = int(dic["published_at"][:4])
+        self.year = int(dic["published_at"][:4])
+        self.area_name = dic["area_name"]
         self.is_needed = dic["is_needed"]
+        self.salaryRub = Salary(dic).salaryRub
 
 
 class Salary:
     '''
         Класс для представленя зарплаты
         Attributes:
-            salary_from (float) нижняя граница вилки оклада
-            salary_to (float) верхняя граница вилки оклада
-            salary_currency (string) Валюта
             averageSalary (int) средняя зарплата
             salaryRub (int) средняя зп в рублях
             >>> type(Salary(dic={"salary_from" : 100, "salary_to" : 200, "salary_currency" : "RUR"})).__name__
@@ -62,14 +93,55 @@ class Salary:
             150.0
             >>> Salary(dic={"salary_from" : 100, "salary_to" : 200, "salary_currency" : "EUR"}).salaryRub
             8985.0
+
         :return: void
     '''
+    __slots__ = ('averageSalary', 'salaryRub')
+
     def __init__(self, dic):
-        self.salary_from = math.floor(float(dic["salary_from"]))
-        self.salary_to = math.floor(float(dic["salary_to"]))
-        self.salary_currency = dic["salary_currency"]
-        self.averageSalary = (self.salary_to + self.salary_from) / 2
-        self.salaryRub = currency_to_rub[self.salary_currency] * self.averageSalary
+        self.averageSalary = (math.floor(float(dic["salary_from"])) + math.floor(float(dic["salary_to"]))) / 2
+        self.salaryRub = currency_to_rub[dic["salary_currency"]] * self.averageSalary
+
+
+@functools.lru_cache(maxsize=1)
+def _load(fileName: str, professionName: str, mtime: float):
+    '''
+        Потоковое чтение и фильтрация csv файла по блокам, в памяти остаются
+        только колонки, нужные аналитике; результат кешируется по mtime файла,
+        поэтому повторные запуски DataSet не перечитывают файл
+        :return: (DataFrame, DataFrame)
+    '''
+    reader = pacsv.open_csv(
+        fileName,
+        read_options=pacsv.ReadOptions(block_size=1 << 20, use_threads=True),
+        parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True, column_types={
+            'salary_from': pa.float32(),
+            'salary_to': pa.float32(),
+            'salary_currency': pa.string(),
+            'area_name': pa.string(),
+            'name': pa.string(),
+            'published_at': pa.string(),
+        }))
+    chunks = []
+    for batch in reader:
+        table = pa.Table.from_batches([batch])
+        mask = pc.is_valid(table['salary_from'])
+        for column in ('salary_to', 'salary_currency', 'area_name', 'name', 'published_at'):
+            mask = pc.and_(mask, pc.is_valid(table[column]))
+        table = table.filter(mask)
+        table = table.append_column('is_needed', pc.match_substring(table['name'], professionName))
+        df = table.to_pandas(types_mapper={pa.string(): pd.ArrowDtype(pa.string())}.get)
+        df["year"] = df["published_at"].str.slice(0, 4).astype('int16')
+        avg = (np.floor(df["salary_from"].to_numpy(dtype='float64')) +
+               np.floor(df["salary_to"].to_numpy(dtype='float64'))) * 0.5
+        currencies = df["salary_currency"].astype('category')
+        rates = np.array([currency_to_rub[c] for c in currencies.cat.categories], dtype='float32')
+        df["salaryRub"] = (avg * rates[currencies.cat.codes.to_numpy()]).astype('float32')
+        chunks.append(df[["year", "area_name", "is_needed", "salaryRub"]])
+    df = pd.concat(chunks, ignore_index=True)
+    df["area_name"] = df["area_name"].astype('category')
+    return df, df[df["is_needed"]]
 
 
 class DataSet:
@@ -83,70 +155,45 @@ class DataSet:
 
     def __init__(self):
         self.inputValues = InputConect()
-        self.csv_reader()
-        self.csv_filter()
+        self.df, self.df_needed = _load(self.inputValues.fileName,
+                                        self.inputValues.professionName,
+                                        os.path.getmtime(self.inputValues.fileName))
         self.getYears()
         self.numberGraph()
         # self.printGraph()
 
-    def csv_reader(self):
-        '''
-            Считывает информацию из файла в переменные
-            :return: void
-        '''
-        with open(self.inputValues.fileName, "r", encoding='utf-8-sig', newline='') as csv_file:
-            file = csv.reader(csv_file)
-            self.firstLine = next(file)
-            self.otherLines = [line for line in file
-                               if not ("" in line) and len(line) == len(self.firstLine)] # a lot eat
-
-    def tryToAdd(self, dic: dict, key, val) -> dict:
+    @staticmethod
+    def tryToAdd(dic: dict, key, val) -> dict:
         '''
         Увеличние значения по ключу, если значение есть, если нет, то добавление записи в словарь
             :param dic: Входной словарь
             :param key: Ключ, которому добовляем значение
             :param val: Значение
             :return: dict
-            >>> DataSet().tryToAdd(dic={'1' : 1}, key='1', val=1)
+            >>> DataSet.tryToAdd(dic={'1' : 1}, key='1', val=1)
             {'1': 2}
-            >>> DataSet().tryToAdd(dic={'1' : 1}, key='2', val=2)
+            >>> DataSet.tryToAdd(dic={'1' : 1}, key='2', val=2)
             {'1': 1, '2': 2}
         '''
-        try:
-            dic[key] += val
-        except:
-            dic[key] = val
+        dic[key] = dic.get(key, 0) + val
         return dic
 
-    def csv_filter(self):
-        '''
-        Фильтрация информации, полученной из csv файла в нужный формат
-            Отбор нужных вакансий, отсев html тегов и т.д.
-               :return: void
-        '''
-        self.filterVacancies = []
-        for line in self.otherLines:
-            newDict = dict(zip(self.firstLine, line))
-            newDict["is_needed"] = newDict["name"].find(self.inputValues.professionName) > -1
-            # vacancy = Vacancy(newDict)
-            self.filterVacancies.append(Vacancy(newDict))
-        self.necessaryVacancies = list(filter(lambda v: v.is_needed, self.filterVacancies))
-
     def getYears(self):
         '''
         Установка поля allYears после фильтрации вакансий
             :return: void
         '''
-        self.allYears = list(set([vacancies.dic["year"] for vacancies in self.filterVacancies]))
+        self.allYears = list(set(self.df["year"].tolist()))
         self.allYears.sort()
 
-    def getAverageSalary(self, count: dict, sum: dict) -> dict:
+    @staticmethod
+    def getAverageSalary(count: dict, sum: dict) -> dict:
         '''
         Получение средней зарплаты
             :param count (dict): Словарь с количеством вакансий по годам
             :param sum (dict): Словарь с суммой зп по годам
             :return: dict
-            >>> DataSet().getAverageSalary(count={'2007' : 2}, sum={'2007' : 10})
+            >>> DataSet.getAverageSalary(count={'2007' : 2}, sum={'2007' : 10})
             {'2007': 5}
         '''
         keySalary = {}
@@ -157,24 +204,27 @@ class DataSet:
                 keySalary[key] = math.floor(sum[key] / value)
         return keySalary
 
-    def getSortedDict(self, keySalary: dict):
+    @staticmethod
+    def getSortedDict(keySalary: dict):
         '''
         Сортировка словаря, обрезка его количества до 10
             :param keySalary:
             :return: dict
-            >>> len(DataSet().getSortedDict(keySalary={'1': 1, '2' : 2, '3' : 3, '4' : 4, '5' : 5, '6' : 6, '7' : 7, '8' : 8, '9' : 9, '10' : 10, '11' : 11, '12' : 12}))
+            >>> len(DataSet.getSortedDict(keySalary={'1': 1, '2' : 2, '3' : 3, '4' : 4, '5' : 5, '6' : 6, '7' : 7, '8' : 8, '9' : 9, '10' : 10, '11' : 11, '12' : 12}))
             10
         '''
-        return dict(list(sorted(keySalary.items(), key=lambda item: item[1], reverse=True))[:10])
+        return dict(heapq.nlargest(10, keySalary.items(), key=lambda item: item[1]))
 
     def updateKeys(self, keyCount: dict) -> dict:
         '''
             Обновление данных в словаре, если данных там нет
             :param keyCount: Количество вакансий по годам
             :return: dict
-        >>> DataSet().updateKeys(keyCount={'2022' : 1000})
+        >>> ds = DataSet.__new__(DataSet)
+        >>> ds.allYears = [2007, 2008, 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022]
+        >>> ds.updateKeys(keyCount={'2022' : 1000})
         {'2022': 1000, 2007: 0, 2008: 0, 2009: 0, 2010: 0, 2011: 0, 2012: 0, 2013: 0, 2014: 0, 2015: 0, 2016: 0, 2017: 0, 2018: 0, 2019: 0, 2020: 0, 2021: 0, 2022: 0}
-        >>> DataSet().updateKeys(keyCount={'2023' : 1000})
+        >>> ds.updateKeys(keyCount={'2023' : 1000})
         {'2023': 1000, 2007: 0, 2008: 0, 2009: 0, 2010: 0, 2011: 0, 2012: 0, 2013: 0, 2014: 0, 2015: 0, 2016: 0, 2017: 0, 2018: 0, 2019: 0, 2020: 0, 2021: 0, 2022: 0}
         '''
 
@@ -183,25 +233,23 @@ class DataSet:
                 keyCount[key] = 0
         return keyCount
 
-    def getKey(self, vacancies: list, key_str: str, isArea: bool) -> (dict, dict):
+    def getKey(self, df, key_str: str, isArea: bool) -> (dict, dict):
         '''
             Получение данных о зп и кол-ве вакансий по ключу key_str
-            :param vacancies: Все вакансии
+            :param df: DataFrame со всеми вакансиями
             :param key_str: Ключ для получения данных
             :param isArea: Флаг
             :return: (dict, dict)
         '''
-        keySum = {}
-        keyCount = {}
-        for v in vacancies:
-            keySum = self.tryToAdd(keySum, v.dic[key_str], v.salary.salaryRub)
-            keyCount = self.tryToAdd(keyCount, v.dic[key_str], 1)
+        g = df.groupby(key_str, sort=True, observed=True)
+        agg = g["salaryRub"].agg(['mean', 'size']).rename(columns={'mean': 'salary', 'size': 'count'})
         if not isArea:
-            keySum = self.updateKeys(keySum)
-            keyCount = self.updateKeys(keyCount)
+            agg = agg.reindex(self.allYears, fill_value=0)
         else:
-            keyCount = dict(filter(lambda item: item[1] / len(vacancies) > 0.01, keyCount.items()))
-        keyAverageSalary = self.getAverageSalary(keyCount, keySum)
+            agg = agg[agg['count'] / len(df) > 0.01]
+        keyCount = agg['count'].to_dict()
+        keyAverageSalary = {key: math.floor(salary) if keyCount[key] else 0
+                            for key, salary in agg['salary'].items()}
         return keyAverageSalary, keyCount
 
     def numberGraph(self):
@@ -209,13 +257,13 @@ class DataSet:
             Установка поля для вывода
             :return: void
         '''
-        count_vacs = len(self.filterVacancies)
+        count_vacs = len(self.df)
         self.yearSalary, self.year_to_count = \
-            self.getKey(self.filterVacancies, "year", False)
+            self.getKey(self.df, "year", False)
         self.yearSalary_needed, self.yearCount = \
-            self.getKey(self.necessaryVacancies, "year", False)
+            self.getKey(self.df_needed, "year", False)
         self.areaSalary, self.area_to_count = \
-            self.getKey(self.filterVacancies, "area_name", True)
+            self.getKey(self.df, "area_name", True)
         self.areaSalary = self.getSortedDict(self.areaSalary)
         self.areaPiece = {key: round(val / count_vacs, 4) for key, val in self.area_to_count.items()}
         self.areaPiece = self.getSortedDict(self.areaPiece)
@@ -277,11 +325,8 @@ class Report:
         execelSheetFirst['C1'] = f'Средняя зарплата - {self.inputValues.professionName}'
         execelSheetFirst['D1'] = 'Количество вакансий'
         execelSheetFirst['E1'] = f'Количество вакансий - {self.inputValues.professionName}'
-        execelSheetFirst['A1'].font = Font(bold=True)
-        execelSheetFirst['B1'].font = Font(bold=True)
-        execelSheetFirst['C1'].font = Font(bold=True)
-        execelSheetFirst['D1'].font = Font(bold=True)
-        execelSheetFirst['E1'].font = Font(bold=True)
+        for cell in ('A1', 'B1', 'C1', 'D1', 'E1'):
+            execelSheetFirst[cell].font = BOLD
         yearRow = list(self.yearSalary.keys())
         firstValue = list(self.yearSalary.values())
         secondValues = list(self.yearSalary_needed.values())
@@ -305,10 +350,8 @@ class Report:
         execelSheetSecond['B1'] = 'Уровень зарплат'
         execelSheetSecond['D1'] = 'Город'
         execelSheetSecond['E1'] = 'Доля вакансий'
-        execelSheetSecond['A1'].font = Font(bold=True)
-        execelSheetSecond['B1'].font = Font(bold=True)
-        execelSheetSecond['D1'].font = Font(bold=True)
-        execelSheetSecond['E1'].font = Font(bold=True)
+        for cell in ('A1', 'B1', 'D1', 'E1'):
+            execelSheetSecond[cell].font = BOLD
         cityes1 = list(self.areaSalary.keys())
         salaryes = list(self.areaSalary.values())
         cityes2 = list(self.areaPiece.keys())
@@ -333,23 +376,9 @@ class Report:
             :param excelSheet: Экземпляр листа эксель
             :return: void
         '''
-        i = 0
-        col_width = list()
-        for col in excelSheet.columns:
-            for j in range(len(col)):
-                if j == 0:
-                    col_width.append(len(str(col[j].value)))
-                else:
-                    if col_width[i] < len(str(col[j].value)):
-                        col_width[i] = len(str(col[j].value))
-            i = i + 1
-
-        for i in range(len(col_width)):
-            col_letter = get_column_letter(i + 1)
-            if col_width[i] > 100:
-                excelSheet.column_dimensions[col_letter].width = 100
-            else:
-                excelSheet.column_dimensions[col_letter].width = col_width[i] + 2
+        for i, col in enumerate(excelSheet.columns, start=1):
+            width = min(100, max((len(str(cell.value)) for cell in col), default=0) + 2)
+            excelSheet.column_dimensions[get_column_letter(i)].width = width
 
     def setBorder(self, columns, excelSheet, numberSheet):
         '''
@@ -359,11 +388,10 @@ class Report:
             :param numberSheet: Номер листа
             :return: void
         '''
-        side = Side(border_style='thin', color="00000000")
         for i in columns:
             column = excelSheet[i]
             for j in column:
-                j.border = Border(left=side, right=side, top=side, bottom=side)
+                j.border = CELL_BORDER
                 if i == 'E' and numberSheet == 1:
                     j.number_format = openpyxl.styles.numbers.BUILTIN_FORMATS[10]
 
@@ -371,9 +399,9 @@ class Report:
         '''Создание графиков для аналитики c помощью matplotlib
             :return: void
         '''
-        years = [i for i in self.yearSalary.keys()]
-        yearSalary = [i for i in self.yearSalary_needed.values()]
-        avg = [i for i in self.yearSalary.values()]
+        years = list(self.yearSalary)
+        yearSalary = list(self.yearSalary_needed.values())
+        avg = list(self.yearSalary.values())
         fig = plt.figure()
         ax = fig.add_subplot(221)
         plt.rcParams.update({'font.size': 8})
@@ -391,8 +419,8 @@ class Report:
 
         ax = fig.add_subplot(222)
         ax.set_title("Количество вакансий по годам", fontsize=8)
-        vacancies = [i for i in self.yearCount.values()]
-        vacanciesAvg = [i for i in self.year_to_count.values()]
+        vacancies = list(self.yearCount.values())
+        vacanciesAvg = list(self.year_to_count.values())
         ax.bar(x_list1, vacanciesAvg, width, label="Количество вакансий")
         ax.bar(x_list2, vacancies, width, label="Количество вакансий аналитик")
         ax.set_xticks(x_nums, years, rotation="vertical")
@@ -404,35 +432,32 @@ class Report:
         ax.invert_yaxis()
         # ax.invert_xaxis()
         ax.set_title("Уровень зарплат по городам", fontsize=8)
-        cyties = [i for i in self.areaSalary.keys()]
-        salary = [i for i in self.areaSalary.values()]
+        cyties = list(self.areaSalary)
+        salary = list(self.areaSalary.values())
         ax.barh(cyties, salary, width, label="уровень з/п", align='center')
         ax.tick_params(axis="both", labelsize=8)
         ax.grid(True, axis="x")
 
         ax = fig.add_subplot(224)
         ax.set_title("Доля вакансий по городам", fontsize=8)
-        cyties = [i for i in self.areaPiece.keys()]
-        values = [i for i in self.areaPiece.values()]
+        cyties = list(self.areaPiece)
+        values = list(self.areaPiece.values())
         ax.pie(values, labels=cyties)
         ax.tick_params(axis="both", labelsize=8)
 
         plt.tight_layout()
         plt.savefig("graph.png")
-        plt.show()
 
     def generate_pdf(self):
         '''Генерация pdf отчета
             :return: void
         '''
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template('pdf_template.html')
         heads1 = ['Год', 'Средняя зарплата', f'Средняя зарплата - {self.inputValues.professionName}',
                   'Количество вакансий', f'Количество вакансий - {self.inputValues.professionName}']
         heads2 = ['Город', 'Уровень зарплат', 'Город', 'Доля вакансий']
         for key in self.areaPiece.keys():
             self.areaPiece[key] = str(round(self.areaPiece[key] * 100, 2)) + '%'
-        pdf_template = template.render({"yearSalary": self.yearSalary,
+        pdf_template = _TEMPLATE.render({"yearSalary": self.yearSalary,
                                         "yearSalary_needed": self.yearSalary_needed,
                                         "year_to_count": self.year_to_count,
                                         "yearCount": self.yearCount,
@@ -440,8 +465,7 @@ class Report:
                                         "areaPiece": self.areaPiece,
                                         "heads1": heads1,
                                         "heads2": heads2, })
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": None})
+        pdfkit.from_string(pdf_template, 'report.pdf', configuration=_pdf_cfg(), options={"enable-local-file-access": None})
         # for key1, value1, key2, value2 in self.areaSalary.items(), self.areaPiece.items():
         #     print(key1)
 
@@ -466,7 +490,7 @@ class InputConect:
         Валидация полей
             :return: void
         '''
-        with open(self.fileName, "r", encoding='utf-8-sig', newline='') as csv_file:
+        with open(self.fileName, "r", encoding='utf-8-sig', newline='', buffering=1 << 20) as csv_file:
             file_iter = iter(csv.reader(csv_file))
             if next(file_iter, "none") == "none":
                 print("Пустой файл")
@@ -481,4 +505,4 @@ if __name__ == "__main__":
     import doctest
 
     doctest.testmod()
-DataSet()
\ No newline at end of file
+    DataSet()
\ No newline at end of file